@@ -1,336 +1,649 @@
 """
 SQLite 데이터베이스 초기화 및 쿼리 함수
 """
-import aiosqlite
-from typing import List, Dict, Any, Optional
-import json
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import quote
+import orjson
+
+
+# DB 파일 경로 (기본값: 프로젝트 디렉터리의 swagger.db)
+DB_PATH = os.getenv(
+    "SWAGGER_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "swagger.db")
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ijson은 정수가 아닌 숫자를 Decimal로 반환하므로 텍스트로 바인딩
+sqlite3.register_adapter(Decimal, str)
+
+# 쓰기 연결은 전용 스레드 1개에서만 사용 (최초 사용 시 생성, 서버 종료 시 close_db)
+_writer_executor: Optional[ThreadPoolExecutor] = None
+_conn: Optional[sqlite3.Connection] = None
+
+# 읽기 전용 연결은 읽기 스레드마다 1개씩 생성해 재사용
+# (WAL 덕분에 동기화 중에도 읽기가 쓰기 스레드를 기다리지 않음)
+READER_POOL_SIZE = 4
+_reader_executor: Optional[ThreadPoolExecutor] = None
+_reader_local = threading.local()
+_reader_conns: List[sqlite3.Connection] = []
+
+# 연결별 prepared statement 캐시 크기 (sqlite3 기본값 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+def _apply_read_pragmas(db: sqlite3.Connection):
+    """읽기/쓰기 연결 공통 PRAGMA 설정"""
+    db.execute("PRAGMA cache_size = -65536")  # 64MB
+    db.execute("PRAGMA temp_store = MEMORY")
+    db.execute("PRAGMA mmap_size = 268435456")  # 256MB
+
+
+def _apply_pragmas(db: sqlite3.Connection):
+    """쓰기 연결 성능 PRAGMA 설정"""
+    # page_size는 빈 DB에서 WAL 전환 전에만 적용됨 (기존 DB에서는 무시)
+    db.execute("PRAGMA page_size = 8192")
+    db.execute("PRAGMA journal_mode = WAL")
+    db.execute("PRAGMA synchronous = NORMAL")
+    _apply_read_pragmas(db)
+    db.execute("PRAGMA foreign_keys = ON")
+    # INSERT OR REPLACE로 삭제되는 행에도 FTS 동기화 트리거가 동작하도록 설정
+    db.execute("PRAGMA recursive_triggers = ON")
+
+
+def _db_uri(mode: str) -> str:
+    """DB_PATH를 SQLite URI로 변환 (mode: rwc, rw, ro)"""
+    return f"file:{quote(os.path.abspath(DB_PATH))}?mode={mode}"
+
+
+def _connect(mode: str) -> sqlite3.Connection:
+    """DB 연결 생성 (close_db가 이벤트 루프 스레드에서 닫을 수 있도록 스레드 검사 비활성화)"""
+    db = sqlite3.connect(
+        _db_uri(mode),
+        uri=True,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False
+    )
+    db.row_factory = sqlite3.Row
+    return db
+
+
+def _writer() -> sqlite3.Connection:
+    """쓰기 스레드의 공유 연결 반환 (최초 호출 시 생성)"""
+    global _conn
+    if _conn is None:
+        _conn = _connect("rwc")
+        _apply_pragmas(_conn)
+    return _conn
+
+
+def _reader() -> sqlite3.Connection:
+    """현재 읽기 스레드의 읽기 전용 연결 반환 (스레드별 최초 호출 시 생성)"""
+    db = getattr(_reader_local, "conn", None)
+    if db is None:
+        db = _connect("ro")
+        _apply_read_pragmas(db)
+        _reader_local.conn = db
+        _reader_conns.append(db)
+    return db
+
+
+def _writer_pool() -> ThreadPoolExecutor:
+    """쓰기 전용 단일 스레드 executor 반환 (최초 호출 시 생성)"""
+    global _writer_executor
+    if _writer_executor is None:
+        _writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+    return _writer_executor
+
+
+async def run_write(fn: Callable[..., T], *args: Any) -> T:
+    """쓰기 스레드에서 fn(쓰기 연결, *args) 실행
+
+    모든 쓰기가 한 스레드에서 순서대로 실행되므로, 트랜잭션은 fn 하나 안에서
+    시작/커밋하면 다른 쓰기와 섞이지 않음
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_writer_pool(), lambda: fn(_writer(), *args))
+
+
+async def _run_read(fn: Callable[..., T], *args: Any) -> T:
+    """읽기 스레드에서 fn(읽기 연결, *args) 실행"""
+    global _reader_executor
+    if _reader_executor is None:
+        _reader_executor = ThreadPoolExecutor(
+            max_workers=READER_POOL_SIZE, thread_name_prefix="sqlite-reader"
+        )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_reader_executor, lambda: fn(_reader(), *args))
+
+
+def _fetch_all(db: sqlite3.Connection, query: str, params: Any = ()) -> List[sqlite3.Row]:
+    """쿼리 결과 전체 조회"""
+    return db.execute(query, params).fetchall()
+
+
+def _fetch_one(db: sqlite3.Connection, query: str, params: Any = ()) -> Optional[sqlite3.Row]:
+    """쿼리 결과 첫 행 조회"""
+    return db.execute(query, params).fetchone()
+
+
+async def close_db():
+    """쓰기 스레드/읽기 스레드 종료 및 연결 정리"""
+    global _conn, _writer_executor, _reader_executor
+    if _reader_executor is not None:
+        _reader_executor.shutdown(wait=True)
+        _reader_executor = None
+    for reader in _reader_conns:
+        reader.close()
+    _reader_conns.clear()
+
+    if _writer_executor is not None:
+        _writer_executor.shutdown(wait=True)
+        _writer_executor = None
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+
+# 테이블 정의 (이름 -> 컬럼 정의, 생성 순서 유지)
+_TABLES: Dict[str, str] = {
+    # 버전 테이블
+    "versions": """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        version TEXT NOT NULL UNIQUE,
+        title TEXT,
+        description TEXT,
+        base_url TEXT,
+        synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    """,
+    # 엔드포인트 테이블
+    "endpoints": """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        version_id INTEGER NOT NULL,
+        path TEXT NOT NULL,
+        method TEXT NOT NULL,
+        summary TEXT,
+        description TEXT,
+        operation_id TEXT,
+        tags TEXT,
+        deprecated INTEGER DEFAULT 0,
+        FOREIGN KEY (version_id) REFERENCES versions (id) ON DELETE CASCADE,
+        UNIQUE(version_id, path, method)
+    """,
+    # 파라미터 테이블
+    "parameters": """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        endpoint_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        in_type TEXT NOT NULL,
+        required INTEGER DEFAULT 0,
+        type TEXT,
+        description TEXT,
+        schema_ref TEXT,
+        FOREIGN KEY (endpoint_id) REFERENCES endpoints (id) ON DELETE CASCADE
+    """,
+    # 스키마 테이블
+    "schemas": """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        version_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        type TEXT,
+        properties TEXT,
+        required_fields TEXT,
+        description TEXT,
+        FOREIGN KEY (version_id) REFERENCES versions (id) ON DELETE CASCADE,
+        UNIQUE(version_id, name)
+    """,
+}
+
+
+# 동기화 일괄 삽입 중에는 삭제했다가 삽입 후 다시 생성하는 보조 인덱스 (이름 -> 대상)
+# UNIQUE 제약의 자동 인덱스와 외래 키 조회용 인덱스는 삭제/중복 검사에 필요하므로 제외
+_BULK_LOAD_INDEXES: Dict[str, str] = {
+    "idx_endpoints_path": "endpoints(path)",
+    "idx_endpoints_ver_method": "endpoints(version_id, method, path)",
+}
+
+
+def drop_bulk_load_indexes(db: sqlite3.Connection):
+    """일괄 삽입 전 보조 인덱스 삭제 (커밋은 호출자가 담당)"""
+    for name in _BULK_LOAD_INDEXES:
+        db.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def create_bulk_load_indexes(db: sqlite3.Connection):
+    """보조 인덱스 생성 (일괄 삽입 후 재생성, 커밋은 호출자가 담당)"""
+    for name, target in _BULK_LOAD_INDEXES.items():
+        db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def _migrate_cascade(db: sqlite3.Connection):
+    """ON DELETE CASCADE 도입 이전에 생성된 테이블을 새 정의로 재생성"""
+    cursor = db.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN ('endpoints', 'parameters', 'schemas')"
+    )
+    legacy = [row[0] for row in cursor.fetchall() if "ON DELETE CASCADE" not in row[1]]
+    if not legacy:
+        return
+
+    # 테이블 재생성 중에는 FK 검사 비활성화 (트랜잭션 밖에서만 변경 가능)
+    db.execute("PRAGMA foreign_keys = OFF")
+    db.execute("BEGIN")
+    try:
+        for name in legacy:
+            db.execute(f"CREATE TABLE {name}_new ({_TABLES[name]})")
+            db.execute(f"INSERT INTO {name}_new SELECT * FROM {name}")
+            db.execute(f"DROP TABLE {name}")
+            db.execute(f"ALTER TABLE {name}_new RENAME TO {name}")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.execute("PRAGMA foreign_keys = ON")
+
+
+def _init_db(db: sqlite3.Connection):
+    """테이블/인덱스/FTS 생성 (쓰기 스레드에서 실행)"""
+    for name, columns in _TABLES.items():
+        db.execute(f"CREATE TABLE IF NOT EXISTS {name} ({columns})")
+
+    # 기존 DB 마이그레이션 (인덱스/트리거는 아래에서 다시 생성됨)
+    _migrate_cascade(db)
+
+    # 읽기 도구 결과 캐시 테이블 (sync 시 전체 무효화)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (namespace, key)
+        ) WITHOUT ROWID
+    """)
+    # 이전 프로세스(이전 코드)가 만든 출력 문자열은 재사용하지 않음
+    db.execute("DELETE FROM cache_entries")
+
+    # 캐시 세대 번호 (clear_cache마다 증가, DB를 공유하는 모든 프로세스가 같은 값을 봄)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS cache_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+    """)
+    db.execute("INSERT OR IGNORE INTO cache_state (id, generation) VALUES (1, 0)")
+
+    # 인덱스 생성
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_endpoints_version
+        ON endpoints(version_id)
+    """)
+    create_bulk_load_indexes(db)
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_schemas_version
+        ON schemas(version_id)
+    """)
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_parameters_endpoint
+        ON parameters(endpoint_id)
+    """)
+
+    # 엔드포인트 검색용 FTS5 인덱스 (endpoints 테이블을 content로 사용)
+    cursor = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'endpoints_fts'"
+    )
+    fts_exists = cursor.fetchone() is not None
+
+    db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS endpoints_fts USING fts5(
+            path, tags, summary, operation_id,
+            content='endpoints', content_rowid='id'
+        )
+    """)
+
+    # endpoints 변경 시 FTS 인덱스 동기화 트리거
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS endpoints_fts_ai AFTER INSERT ON endpoints BEGIN
+            INSERT INTO endpoints_fts (rowid, path, tags, summary, operation_id)
+            VALUES (new.id, new.path, new.tags, new.summary, new.operation_id);
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS endpoints_fts_ad AFTER DELETE ON endpoints BEGIN
+            INSERT INTO endpoints_fts (endpoints_fts, rowid, path, tags, summary, operation_id)
+            VALUES ('delete', old.id, old.path, old.tags, old.summary, old.operation_id);
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS endpoints_fts_au AFTER UPDATE ON endpoints BEGIN
+            INSERT INTO endpoints_fts (endpoints_fts, rowid, path, tags, summary, operation_id)
+            VALUES ('delete', old.id, old.path, old.tags, old.summary, old.operation_id);
+            INSERT INTO endpoints_fts (rowid, path, tags, summary, operation_id)
+            VALUES (new.id, new.path, new.tags, new.summary, new.operation_id);
+        END
+    """)
+
+    # FTS 도입 전에 저장된 데이터가 있으면 인덱스 재구성
+    if not fts_exists:
+        db.execute("INSERT INTO endpoints_fts (endpoints_fts) VALUES ('rebuild')")
+
+    db.commit()
 
 
-DB_PATH = "/Users/kimjunhyuk/Desktop/swagger-mcp-server/swagger.db"
+async def init_db():
+    """데이터베이스 초기화 및 테이블 생성 (스키마 변경은 이 함수에서만 수행)"""
+    await run_write(_init_db)
 
 
-async def init_db():
-    """데이터베이스 초기화 및 테이블 생성"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        # 버전 테이블
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS versions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                version TEXT NOT NULL UNIQUE,
-                title TEXT,
-                description TEXT,
-                base_url TEXT,
-                synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # 엔드포인트 테이블
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS endpoints (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                version_id INTEGER NOT NULL,
-                path TEXT NOT NULL,
-                method TEXT NOT NULL,
-                summary TEXT,
-                description TEXT,
-                operation_id TEXT,
-                tags TEXT,
-                deprecated INTEGER DEFAULT 0,
-                FOREIGN KEY (version_id) REFERENCES versions (id),
-                UNIQUE(version_id, path, method)
-            )
-        """)
-
-        # 파라미터 테이블
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS parameters (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                endpoint_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                in_type TEXT NOT NULL,
-                required INTEGER DEFAULT 0,
-                type TEXT,
-                description TEXT,
-                schema_ref TEXT,
-                FOREIGN KEY (endpoint_id) REFERENCES endpoints (id)
-            )
-        """)
-
-        # 스키마 테이블
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS schemas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                version_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                type TEXT,
-                properties TEXT,
-                required_fields TEXT,
-                description TEXT,
-                FOREIGN KEY (version_id) REFERENCES versions (id),
-                UNIQUE(version_id, name)
-            )
-        """)
-
-        # 인덱스 생성
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_endpoints_version
-            ON endpoints(version_id)
-        """)
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_endpoints_path
-            ON endpoints(path)
-        """)
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_schemas_version
-            ON schemas(version_id)
-        """)
-
-        await db.commit()
-
-
-async def insert_version(version: str, title: str, description: str, base_url: str) -> int:
-    """새 버전 정보 삽입"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            INSERT OR REPLACE INTO versions (version, title, description, base_url)
-            VALUES (?, ?, ?, ?)
-            """,
-            (version, title, description, base_url)
-        )
-        await db.commit()
-        return cursor.lastrowid
+def analyze(db: sqlite3.Connection):
+    """쿼리 플래너 통계 갱신"""
+    db.execute("ANALYZE")
+    db.commit()
 
 
-async def get_version_id(version: str) -> Optional[int]:
-    """버전 문자열로 버전 ID 조회"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            "SELECT id FROM versions WHERE version = ?",
-            (version,)
-        )
-        row = await cursor.fetchone()
-        return row[0] if row else None
+async def cache_get(namespace: str, key: str) -> Optional[str]:
+    """캐시된 도구 결과 조회"""
+    row = await _run_read(
+        _fetch_one,
+        "SELECT value FROM cache_entries WHERE namespace = ? AND key = ?",
+        (namespace, key)
+    )
+    return row[0] if row else None
 
 
-async def insert_endpoint(
-    version_id: int,
-    path: str,
-    method: str,
-    summary: str,
-    description: str,
-    operation_id: str,
-    tags: List[str],
-    deprecated: bool = False
-) -> int:
-    """엔드포인트 정보 삽입"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            INSERT OR REPLACE INTO endpoints
-            (version_id, path, method, summary, description, operation_id, tags, deprecated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (version_id, path, method, summary, description, operation_id,
-             json.dumps(tags), 1 if deprecated else 0)
-        )
-        await db.commit()
-        return cursor.lastrowid
+async def cache_token() -> int:
+    """캐시 저장 토큰 (결과 생성 전에 받은 현재 캐시 세대 번호)"""
+    row = await _run_read(_fetch_one, "SELECT generation FROM cache_state")
+    return row[0]
 
 
-async def insert_parameter(
-    endpoint_id: int,
-    name: str,
-    in_type: str,
-    required: bool,
-    param_type: str,
-    description: str,
-    schema_ref: Optional[str] = None
-):
-    """파라미터 정보 삽입"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """
-            INSERT INTO parameters
-            (endpoint_id, name, in_type, required, type, description, schema_ref)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (endpoint_id, name, in_type, 1 if required else 0, param_type, description, schema_ref)
-        )
-        await db.commit()
-
-
-async def insert_schema(
-    version_id: int,
-    name: str,
-    schema_type: str,
-    properties: Dict[str, Any],
-    required_fields: List[str],
-    description: str
-):
-    """스키마 정보 삽입"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
+def _cache_put(db: sqlite3.Connection, namespace: str, key: str, value: str, token: int):
+    """도구 결과 캐시 저장 (쓰기 스레드에서 실행, 세대 번호가 token과 같을 때만 저장)
+
+    캐시 저장 실패는 도구 결과에 영향을 주지 않으므로 로그만 남기고, 다음
+    동기화의 BEGIN이 실패하지 않도록 열린 트랜잭션은 되돌림
+    """
+    try:
+        db.execute(
             """
-            INSERT OR REPLACE INTO schemas
-            (version_id, name, type, properties, required_fields, description)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT OR REPLACE INTO cache_entries (namespace, key, value)
+            SELECT ?, ?, ? FROM cache_state WHERE generation = ?
             """,
-            (version_id, name, schema_type, json.dumps(properties),
-             json.dumps(required_fields), description)
+            (namespace, key, value, token)
         )
-        await db.commit()
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        logger.warning(f"Failed to store cache entry ({namespace}): {e}")
 
 
-async def list_endpoints(
-    version: Optional[str] = None,
-    path_pattern: Optional[str] = None,
-    method: Optional[str] = None,
-    tag: Optional[str] = None
-) -> List[Dict[str, Any]]:
-    """엔드포인트 목록 조회"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+def cache_put(namespace: str, key: str, value: str, token: int):
+    """도구 결과 캐시 저장을 쓰기 스레드에 예약 (완료를 기다리지 않음)
 
-        query = """
-            SELECT e.*, v.version
-            FROM endpoints e
-            JOIN versions v ON e.version_id = v.id
-            WHERE 1=1
+    읽기 도구가 동기화 작업 뒤에서 쓰기 스레드를 기다리지 않도록 저장은 비동기로
+    처리하며, 읽기 연결은 동기화 커밋 이전 스냅샷을 볼 수 있으므로 token을 받은 뒤
+    어느 프로세스에서든 동기화가 커밋되었다면 저장하지 않음 (저장 쿼리 안에서 확인)
+    """
+    # close_db 이후에는 쓰기 스레드를 다시 만들지 않고 저장을 건너뜀
+    executor = _writer_executor
+    if executor is None:
+        return
+    executor.submit(lambda: _cache_put(_writer(), namespace, key, value, token))
+
+
+def clear_cache(db: sqlite3.Connection):
+    """캐시 전체 무효화 및 세대 번호 증가 (커밋은 호출자가 담당)"""
+    db.execute("UPDATE cache_state SET generation = generation + 1")
+    db.execute("DELETE FROM cache_entries")
+
+
+def insert_version(
+    version: str,
+    title: str,
+    description: str,
+    base_url: str,
+    db: sqlite3.Connection
+) -> int:
+    """새 버전 정보 삽입 (커밋은 호출자가 담당)"""
+    cursor = db.execute(
         """
-        params = []
+        INSERT OR REPLACE INTO versions (version, title, description, base_url)
+        VALUES (?, ?, ?, ?)
+        """,
+        (version, title, description, base_url)
+    )
+    return cursor.lastrowid
 
-        if version:
-            query += " AND v.version = ?"
-            params.append(version)
 
-        if path_pattern:
-            query += " AND e.path LIKE ?"
-            params.append(f"%{path_pattern}%")
+def insert_endpoints(rows: List[Tuple], db: sqlite3.Connection):
+    """엔드포인트 일괄 삽입 (커밋은 호출자가 담당)
 
-        if method:
-            query += " AND e.method = ?"
-            params.append(method.upper())
+    Args:
+        rows: (version_id, path, method, summary, description, operation_id, tags_json, deprecated) 튜플 목록
+    """
+    db.executemany(
+        """
+        INSERT OR REPLACE INTO endpoints
+        (version_id, path, method, summary, description, operation_id, tags, deprecated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows
+    )
 
-        if tag:
-            query += " AND e.tags LIKE ?"
-            params.append(f"%{tag}%")
 
-        cursor = await db.execute(query, params)
-        rows = await cursor.fetchall()
+def get_endpoint_ids(version_id: int, db: sqlite3.Connection) -> Dict[Tuple[str, str], int]:
+    """버전의 (path, method) -> 엔드포인트 ID 매핑 조회"""
+    rows = _fetch_all(db, "SELECT id, path, method FROM endpoints WHERE version_id = ?", (version_id,))
+    return {(row[1], row[2]): row[0] for row in rows}
 
-        return [dict(row) for row in rows]
 
+def insert_parameters(rows: List[Tuple], db: sqlite3.Connection):
+    """파라미터 일괄 삽입 (커밋은 호출자가 담당)
 
-async def get_endpoint_details(endpoint_id: int) -> Optional[Dict[str, Any]]:
-    """엔드포인트 상세 정보 조회 (파라미터 포함)"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    Args:
+        rows: (endpoint_id, name, in_type, required, type, description, schema_ref) 튜플 목록
+    """
+    db.executemany(
+        """
+        INSERT INTO parameters
+        (endpoint_id, name, in_type, required, type, description, schema_ref)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows
+    )
 
-        # 엔드포인트 기본 정보
-        cursor = await db.execute(
-            """
-            SELECT e.*, v.version
+
+def insert_schemas(rows: List[Tuple], db: sqlite3.Connection):
+    """스키마 일괄 삽입 (커밋은 호출자가 담당)
+
+    Args:
+        rows: (version_id, name, type, properties_json, required_fields_json, description) 튜플 목록
+    """
+    db.executemany(
+        """
+        INSERT OR REPLACE INTO schemas
+        (version_id, name, type, properties, required_fields, description)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        rows
+    )
+
+
+def _fts_phrase(column: str, text: str, prefix: bool = False) -> Optional[str]:
+    """검색어를 FTS5 컬럼 필터 구문으로 변환 (토큰이 없으면 None)"""
+    tokens = re.findall(r"[^\W_]+", text)
+    if not tokens:
+        return None
+    return f'{column} : "{" ".join(tokens)}"' + ("*" if prefix else "")
+
+
+# list_endpoints 필터 비트 (필터 조합별 SQL 선택용)
+_FILTER_VERSION = 1
+_FILTER_PATH = 2
+_FILTER_METHOD = 4
+_FILTER_TAG = 8
+
+
+def _build_endpoint_sql(columns: str, mask: int) -> str:
+    """필터 조합(mask)에 해당하는 엔드포인트 검색 SQL 생성 (모듈 로드 시에만 호출)"""
+    # 경로 검색은 FTS5 인덱스로 처리
+    if mask & _FILTER_PATH:
+        query = f"""
+            SELECT {columns}
+            FROM endpoints_fts f
+            JOIN endpoints e ON e.id = f.rowid
+            JOIN versions v ON e.version_id = v.id
+            WHERE endpoints_fts MATCH ?
+        """
+    else:
+        query = f"""
+            SELECT {columns}
             FROM endpoints e
             JOIN versions v ON e.version_id = v.id
-            WHERE e.id = ?
-            """,
-            (endpoint_id,)
-        )
-        endpoint = await cursor.fetchone()
+            WHERE 1=1
+        """
 
-        if not endpoint:
-            return None
+    if mask & _FILTER_VERSION:
+        query += " AND v.version = ?"
 
-        # 파라미터 정보
-        cursor = await db.execute(
-            "SELECT * FROM parameters WHERE endpoint_id = ?",
-            (endpoint_id,)
-        )
-        parameters = await cursor.fetchall()
+    if mask & _FILTER_METHOD:
+        query += " AND e.method = ?"
 
-        result = dict(endpoint)
-        result["parameters"] = [dict(p) for p in parameters]
+    # 태그는 JSON 배열 원소와 정확히 일치하는 경우만 매칭
+    if mask & _FILTER_TAG:
+        query += " AND EXISTS (SELECT 1 FROM json_each(e.tags) je WHERE je.value = ?)"
 
-        return result
+    return query
 
 
-async def get_schema(version: str, schema_name: str) -> Optional[Dict[str, Any]]:
-    """스키마 정보 조회"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+# 필터 조합 16가지의 SQL을 미리 생성 (SQL 텍스트가 고정되어 statement 캐시를 항상 재사용)
+_ENDPOINT_TEXT_QUERIES = [
+    _build_endpoint_sql(
+        "printf(?, e.id, e.method, e.path, coalesce(e.summary, 'N/A'), e.tags, v.version)",
+        mask
+    )
+    for mask in range(16)
+]
 
-        cursor = await db.execute(
-            """
-            SELECT s.*
-            FROM schemas s
-            JOIN versions v ON s.version_id = v.id
-            WHERE v.version = ? AND s.name = ?
-            """,
-            (version, schema_name)
-        )
-        row = await cursor.fetchone()
 
-        if not row:
-            return None
+def _endpoint_filters(
+    version: Optional[str],
+    path_pattern: Optional[str],
+    method: Optional[str],
+    tag: Optional[str]
+) -> Tuple[int, List[Any]]:
+    """필터 값으로 SQL 선택 mask와 바인딩 파라미터 계산 (파라미터는 SQL의 ? 순서)"""
+    match_term = _fts_phrase("path", path_pattern, prefix=True) if path_pattern else None
 
-        result = dict(row)
-        if result.get("properties"):
-            result["properties"] = json.loads(result["properties"])
-        if result.get("required_fields"):
-            result["required_fields"] = json.loads(result["required_fields"])
+    mask = 0
+    params = []
+    if match_term:
+        mask |= _FILTER_PATH
+        params.append(match_term)
 
-        return result
+    if version:
+        mask |= _FILTER_VERSION
+        params.append(version)
 
+    if method:
+        mask |= _FILTER_METHOD
+        params.append(method.upper())
 
-async def list_versions() -> List[Dict[str, Any]]:
-    """저장된 모든 버전 목록 조회"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    if tag:
+        mask |= _FILTER_TAG
+        params.append(tag)
+
+    return mask, params
+
+
+# list_endpoints 도구 출력 형식 (SQLite printf 포맷)
+_ENDPOINT_TEXT_FORMAT = "[%d] %s %s\n  - 요약: %s\n  - 태그: %s\n  - 버전: %s\n"
 
-        cursor = await db.execute(
-            "SELECT * FROM versions ORDER BY synced_at DESC"
-        )
-        rows = await cursor.fetchall()
 
-        return [dict(row) for row in rows]
+async def list_endpoints_text(
+    version: Optional[str] = None,
+    path_pattern: Optional[str] = None,
+    method: Optional[str] = None,
+    tag: Optional[str] = None
+) -> List[str]:
+    """엔드포인트 목록을 SQLite에서 바로 출력용 문자열로 조회"""
+    mask, params = _endpoint_filters(version, path_pattern, method, tag)
+    rows = await _run_read(_fetch_all, _ENDPOINT_TEXT_QUERIES[mask], [_ENDPOINT_TEXT_FORMAT, *params])
+    return [row[0] for row in rows]
 
 
-async def delete_version(version: str):
-    """버전 및 관련 데이터 삭제"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        version_id = await get_version_id(version)
+async def get_endpoint_details(endpoint_id: int) -> Optional[Dict[str, Any]]:
+    """엔드포인트 상세 정보 조회 (파라미터는 같은 쿼리에서 JSON 배열로 함께 조회)"""
+    row = await _run_read(
+        _fetch_one,
+        """
+        SELECT e.*, v.version,
+            (
+                SELECT json_group_array(json_object(
+                    'name', p.name,
+                    'in_type', p.in_type,
+                    'required', p.required,
+                    'type', p.type,
+                    'description', p.description,
+                    'schema_ref', p.schema_ref
+                ))
+                FROM parameters p
+                WHERE p.endpoint_id = e.id
+            ) AS parameters
+        FROM endpoints e
+        JOIN versions v ON e.version_id = v.id
+        WHERE e.id = ?
+        """,
+        (endpoint_id,)
+    )
+
+    if not row:
+        return None
+
+    result = dict(row)
+    result["parameters"] = orjson.loads(result["parameters"])
+    return result
 
-        if not version_id:
-            return
 
-        # 파라미터 삭제
-        await db.execute(
-            """
-            DELETE FROM parameters
-            WHERE endpoint_id IN (
-                SELECT id FROM endpoints WHERE version_id = ?
-            )
-            """,
-            (version_id,)
-        )
+async def get_schema(version: str, schema_name: str) -> Optional[Dict[str, Any]]:
+    """스키마 정보 조회"""
+    row = await _run_read(
+        _fetch_one,
+        """
+        SELECT s.*
+        FROM schemas s
+        JOIN versions v ON s.version_id = v.id
+        WHERE v.version = ? AND s.name = ?
+        """,
+        (version, schema_name)
+    )
 
-        # 엔드포인트 삭제
-        await db.execute(
-            "DELETE FROM endpoints WHERE version_id = ?",
-            (version_id,)
-        )
+    if not row:
+        return None
 
-        # 스키마 삭제
-        await db.execute(
-            "DELETE FROM schemas WHERE version_id = ?",
-            (version_id,)
-        )
+    result = dict(row)
+    if result.get("properties"):
+        result["properties"] = orjson.loads(result["properties"])
+    if result.get("required_fields"):
+        result["required_fields"] = orjson.loads(result["required_fields"])
+
+    return result
+
+
+async def list_versions() -> List[sqlite3.Row]:
+    """저장된 모든 버전 목록 조회 (Row를 그대로 반환)"""
+    return await _run_read(_fetch_all, "SELECT * FROM versions ORDER BY synced_at DESC")
 
-        # 버전 삭제
-        await db.execute(
-            "DELETE FROM versions WHERE id = ?",
-            (version_id,)
-        )
 
-        await db.commit()
+def delete_version(version: str, db: sqlite3.Connection):
+    """버전 및 관련 데이터 삭제 (엔드포인트/파라미터/스키마는 ON DELETE CASCADE로 함께 삭제, 커밋은 호출자가 담당)"""
+    db.execute("DELETE FROM versions WHERE version = ?", (version,))
@@ -2,27 +2,128 @@
 Swagger JSON 파싱 및 DB 저장
 """
 import httpx
-from typing import Dict, Any, Optional
+import ijson
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 import logging
+import sqlite3
+import orjson
 
 from db import (
+    analyze,
+    clear_cache,
+    create_bulk_load_indexes,
+    drop_bulk_load_indexes,
+    run_write,
     insert_version,
-    get_version_id,
-    insert_endpoint,
-    insert_parameter,
-    insert_schema,
+    insert_endpoints,
+    get_endpoint_ids,
+    insert_parameters,
+    insert_schemas,
     delete_version
 )
 
 logger = logging.getLogger(__name__)
 
 
-async def fetch_swagger_json(url: str) -> Dict[str, Any]:
-    """주어진 URL에서 Swagger JSON 가져오기 30초 넘어가면 타임아웃"""
+# 전체 객체로 조립하는 최상위 섹션 (prefix -> 섹션 이름)
+_WHOLE_SECTIONS = {"info": "info", "servers": "servers"}
+
+# 항목(키) 단위로 조립하는 섹션 (prefix -> 섹션 이름)
+_ITEM_SECTIONS = {"paths": "paths", "components.schemas": "schemas"}
+
+
+class _AsyncByteReader:
+    """httpx 바이트 스트림을 ijson이 읽을 수 있는 비동기 파일 객체로 변환"""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson은 read(0)으로 bytes/str 타입만 확인하므로 청크를 소비하지 않음
+        if size == 0:
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
+async def fetch_swagger_events(url: str) -> AsyncIterator[Tuple[str, str, Any]]:
+    """주어진 URL의 Swagger JSON을 스트리밍하며 ijson (prefix, event, value) 이벤트 생성 (30초 타임아웃)"""
     async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.json()
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            reader = _AsyncByteReader(response.aiter_bytes())
+            async for event in ijson.parse_async(reader):
+                yield event
+
+
+async def iter_spec_sections(
+    events: AsyncIterator[Tuple[str, str, Any]]
+) -> AsyncIterator[Tuple[str, Optional[str], Any]]:
+    """이벤트 스트림을 (섹션, 키, 객체) 단위로 조립
+
+    info/servers는 전체 객체로, paths/components.schemas는 항목 하나씩 조립하므로
+    스펙 전체를 메모리에 올리지 않음
+    """
+    builder: Optional[ijson.ObjectBuilder] = None
+    item_prefix = end_event = None
+    section: Optional[str] = None
+    key: Optional[str] = None
+    pending: Optional[Tuple[str, str, str]] = None
+
+    async for prefix, event, value in events:
+        # 조립 중인 객체의 하위 이벤트
+        if builder is not None:
+            if prefix == item_prefix and event == end_event:
+                yield section, key, builder.value
+                builder = None
+            else:
+                builder.event(event, value)
+            continue
+
+        # paths / components.schemas의 다음 항목 키
+        if event == "map_key" and prefix in _ITEM_SECTIONS:
+            pending = (f"{prefix}.{value}", _ITEM_SECTIONS[prefix], value)
+            continue
+
+        if pending is not None and prefix == pending[0]:
+            item_prefix, section, key = pending
+            pending = None
+        elif prefix in _WHOLE_SECTIONS and event in ("start_map", "start_array"):
+            item_prefix, section, key = prefix, _WHOLE_SECTIONS[prefix], None
+        else:
+            continue
+
+        if event in ("start_map", "start_array"):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            end_event = "end_" + event[len("start_"):]
+        else:
+            yield section, key, value
+
+
+# SQLite INTEGER 및 orjson이 다룰 수 있는 정수 범위
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _fit_int64(value: Any) -> Any:
+    """64비트 범위를 벗어난 정수를 문자열로 변환 (tuple/list/dict는 재귀 처리)"""
+    if isinstance(value, int) and not _INT64_MIN <= value <= _INT64_MAX:
+        return str(value)
+    if isinstance(value, tuple):
+        return tuple(_fit_int64(item) for item in value)
+    if isinstance(value, list):
+        return [_fit_int64(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _fit_int64(item) for key, item in value.items()}
+    return value
+
+
+def _dumps(value: Any) -> str:
+    """JSON 컬럼용 직렬화 (Decimal은 문자열로 저장)"""
+    return orjson.dumps(_fit_int64(value), default=str).decode()
 
 
 def extract_schema_ref(ref: str) -> str:
@@ -41,52 +142,56 @@ async def parse_and_store_swagger(swagger_url: str, version_name: Optional[str]
         version_name: 버전 식별자 (기본값: URL에서 추출)
     """
     try:
-        # Swagger JSON 가져오기
+        # Swagger JSON을 스트리밍으로 받으며 항목 단위로 행 데이터 생성 (트랜잭션 밖에서 수행)
         logger.info(f"Fetching Swagger JSON from {swagger_url}")
-        swagger_data = await fetch_swagger_json(swagger_url)
+        info: Dict[str, Any] = {}
+        servers: List[Dict[str, Any]] = []
+        schema_rows = []
+        endpoint_rows = []
+        endpoint_params: Dict[Tuple[str, str], List[Tuple]] = {}
+
+        async for section, key, obj in iter_spec_sections(fetch_swagger_events(swagger_url)):
+            if section == "info":
+                info = obj
+            elif section == "servers":
+                servers = obj
+            elif section == "schemas":
+                schema_rows.append(build_schema_row(key, obj))
+            elif section == "paths":
+                for method, operation in obj.items():
+                    if method.lower() in ["get", "post", "put", "delete", "patch", "options", "head"]:
+                        endpoint_rows.append(build_endpoint_row(key, method.upper(), operation))
+                        endpoint_params[(key, method.upper())] = build_param_rows(operation)
 
         # 버전 정보 추출
-        info = swagger_data.get("info", {})
-        title = info.get("title", "Unknown API")
-        description = info.get("description", "")
-        api_version = version_name or info.get("version", "1.0.0")
+        title, description, api_version = _fit_int64((
+            info.get("title", "Unknown API"),
+            info.get("description", ""),
+            version_name or info.get("version", "1.0.0")
+        ))
 
         # 서버 URL 추출
-        servers = swagger_data.get("servers", [])
         base_url = servers[0].get("url", "") if servers else ""
 
-        logger.info(f"Parsing API: {title} (version: {api_version})")
-
-        # 기존 버전 데이터 삭제 (재동기화)
-        await delete_version(api_version)
-
-        # 버전 정보 저장
-        version_id = await insert_version(api_version, title, description, base_url)
-
-        # 스키마 파싱 및 저장
-        components = swagger_data.get("components", {})
-        schemas = components.get("schemas", {})
-
-        for schema_name, schema_def in schemas.items():
-            await parse_schema(version_id, schema_name, schema_def)
+        logger.info(f"Parsed API: {title} (version: {api_version})")
 
-        # 엔드포인트 파싱 및 저장
-        paths = swagger_data.get("paths", {})
-        endpoint_count = 0
+        endpoint_count = len(endpoint_rows)
+        schema_count = len(schema_rows)
 
-        for path, path_item in paths.items():
-            for method, operation in path_item.items():
-                if method.lower() in ["get", "post", "put", "delete", "patch", "options", "head"]:
-                    await parse_endpoint(version_id, path, method.upper(), operation)
-                    endpoint_count += 1
+        # 삭제 + 삽입 + 통계 갱신 전체를 쓰기 스레드에서 한 번에 실행
+        await run_write(
+            store_version,
+            api_version, title, description, base_url,
+            schema_rows, endpoint_rows, endpoint_params
+        )
 
-        logger.info(f"Successfully stored {endpoint_count} endpoints and {len(schemas)} schemas")
+        logger.info(f"Successfully stored {endpoint_count} endpoints and {schema_count} schemas")
 
         return {
             "version": api_version,
             "title": title,
             "endpoints": endpoint_count,
-            "schemas": len(schemas)
+            "schemas": schema_count
         }
 
     except httpx.HTTPError as e:
@@ -97,8 +202,56 @@ async def parse_and_store_swagger(swagger_url: str, version_name: Optional[str]
         raise Exception(f"Failed to parse Swagger: {str(e)}")
 
 
-async def parse_schema(version_id: int, schema_name: str, schema_def: Dict[str, Any]):
-    """스키마 정의 파싱 및 저장"""
+def store_version(
+    db: sqlite3.Connection,
+    api_version: str,
+    title: str,
+    description: str,
+    base_url: str,
+    schema_rows: List[Tuple],
+    endpoint_rows: List[Tuple],
+    endpoint_params: Dict[Tuple[str, str], List[Tuple]]
+):
+    """버전 데이터를 교체 저장 (쓰기 스레드에서 실행)"""
+    # 삭제 + 삽입 전체를 하나의 트랜잭션으로 처리 (커밋/fsync 1회)
+    db.execute("BEGIN")
+    try:
+        # 행마다 갱신하지 않도록 보조 인덱스는 삭제 후 마지막에 한 번에 생성
+        drop_bulk_load_indexes(db)
+
+        # 기존 버전 데이터 삭제 (재동기화) 및 도구 결과 캐시 무효화
+        delete_version(api_version, db)
+        clear_cache(db)
+
+        # 버전 정보 저장
+        version_id = insert_version(api_version, title, description, base_url, db)
+
+        insert_schemas([(version_id, *row) for row in schema_rows], db)
+        insert_endpoints([(version_id, *row) for row in endpoint_rows], db)
+
+        # 파라미터 일괄 저장 (엔드포인트 ID는 삽입 후 한 번에 조회)
+        endpoint_ids = get_endpoint_ids(version_id, db)
+        insert_parameters(
+            [
+                (endpoint_ids[key], *param_row)
+                for key, param_rows in endpoint_params.items()
+                for param_row in param_rows
+            ],
+            db
+        )
+
+        create_bulk_load_indexes(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # 새 데이터 기준으로 인덱스 통계 갱신
+    analyze(db)
+
+
+def build_schema_row(schema_name: str, schema_def: Dict[str, Any]) -> Tuple:
+    """스키마 정의 파싱 → version_id를 제외한 schemas 행"""
     schema_type = schema_def.get("type", "object")
     properties = schema_def.get("properties", {})
     required_fields = schema_def.get("required", [])
@@ -131,40 +284,51 @@ async def parse_schema(version_id: int, schema_name: str, schema_def: Dict[str,
                 "format": prop_def.get("format", "")
             }
 
-    await insert_schema(
-        version_id,
+    return _fit_int64((
         schema_name,
         schema_type,
-        simplified_properties,
-        required_fields,
+        _dumps(simplified_properties),
+        _dumps(required_fields),
         description
-    )
+    ))
 
 
-async def parse_endpoint(version_id: int, path: str, method: str, operation: Dict[str, Any]):
-    """엔드포인트 정보 파싱 및 저장"""
+def build_endpoint_row(path: str, method: str, operation: Dict[str, Any]) -> Tuple:
+    """엔드포인트 정보 파싱 → version_id를 제외한 endpoints 행"""
     summary = operation.get("summary", "")
     description = operation.get("description", "")
     operation_id = operation.get("operationId", "")
     tags = operation.get("tags", [])
     deprecated = operation.get("deprecated", False)
 
-    # 엔드포인트 저장
-    endpoint_id = await insert_endpoint(
-        version_id,
+    return _fit_int64((
         path,
         method,
         summary,
         description,
         operation_id,
-        tags,
-        deprecated
-    )
+        _dumps(tags),
+        1 if deprecated else 0
+    ))
+
+
+def build_param_rows(operation: Dict[str, Any]) -> List[Tuple]:
+    """파라미터 및 Request Body 파싱 → endpoint_id를 제외한 parameters 행 목록"""
+    param_rows = []
 
     # 파라미터 파싱
-    parameters = operation.get("parameters", [])
-    for param in parameters:
-        await parse_parameter(endpoint_id, param)
+    for param in operation.get("parameters", []):
+        schema = param.get("schema", {})
+        ref = schema.get("$ref", "")
+
+        param_rows.append((
+            param.get("name", ""),
+            param.get("in", ""),
+            1 if param.get("required", False) else 0,
+            schema.get("type", "string"),
+            param.get("description", ""),
+            extract_schema_ref(ref) if ref else None
+        ))
 
     # Request Body 파싱 (POST, PUT 등)
     request_body = operation.get("requestBody", {})
@@ -175,34 +339,13 @@ async def parse_endpoint(version_id: int, path: str, method: str, operation: Dic
             ref = schema.get("$ref", "")
 
             if ref:
-                await insert_parameter(
-                    endpoint_id,
+                param_rows.append((
                     "requestBody",
                     "body",
-                    request_body.get("required", False),
+                    1 if request_body.get("required", False) else 0,
                     content_type,
                     request_body.get("description", ""),
                     extract_schema_ref(ref)
-                )
-
-
-async def parse_parameter(endpoint_id: int, param: Dict[str, Any]):
-    """파라미터 정보 파싱 및 저장"""
-    name = param.get("name", "")
-    in_type = param.get("in", "")
-    required = param.get("required", False)
-    description = param.get("description", "")
-
-    schema = param.get("schema", {})
-    param_type = schema.get("type", "string")
-    ref = schema.get("$ref", "")
-
-    await insert_parameter(
-        endpoint_id,
-        name,
-        in_type,
-        required,
-        param_type,
-        description,
-        extract_schema_ref(ref) if ref else None
-    )
+                ))
+
+    return [_fit_int64(row) for row in param_rows]
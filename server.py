@@ -2,12 +2,19 @@
 Swagger MCP 서버 메인 (FastMCP 버전)
 """
 import os
-from typing import Optional
+from contextlib import asynccontextmanager
+from itertools import chain
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+import orjson
 from mcp.server.fastmcp import FastMCP
 
 from db import (
     init_db,
-    list_endpoints as db_list_endpoints,
+    close_db,
+    cache_get,
+    cache_put,
+    cache_token,
+    list_endpoints_text as db_list_endpoints_text,
     get_endpoint_details as db_get_endpoint_details,
     get_schema as db_get_schema,
     list_versions as db_list_versions
@@ -16,8 +23,18 @@ from parser import parse_and_store_swagger
 
 SWAGGER_URL = os.getenv("SWAGGER_URL", "http://localhost:8080/v3/api-docs")
 
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """서버 종료 시 공유 DB 연결 정리"""
+    try:
+        yield
+    finally:
+        await close_db()
+
+
 # FastMCP 인스턴스 생성
-mcp = FastMCP()
+mcp = FastMCP(lifespan=lifespan)
 
 
 async def ensure_db_initialized():
@@ -32,6 +49,18 @@ async def ensure_db_initialized():
 _db_initialized = False
 
 
+async def cached(namespace: str, args: Dict[str, Any], render: Callable[[], Awaitable[str]]) -> str:
+    """읽기 도구 결과를 cache_entries에 캐시 (sync_swagger 시 무효화)"""
+    key = orjson.dumps(args, option=orjson.OPT_SORT_KEYS).decode()
+    value = await cache_get(namespace, key)
+    if value is None:
+        # 결과를 만들기 전의 캐시 세대를 받아 두고, 저장 시점에 달라졌으면 저장하지 않음
+        token = await cache_token()
+        value = await render()
+        cache_put(namespace, key, value, token)
+    return value
+
+
 @mcp.tool()
 async def sync_swagger(version: Optional[str] = None) -> str:
     """Swagger JSON을 가져와 파싱하고 SQLite DB에 저장합니다.
@@ -61,32 +90,39 @@ async def list_endpoints(
 
     Args:
         version: API 버전 필터
-        path_pattern: 경로 패턴 검색 (부분 일치)
+        path_pattern: 경로 패턴 검색 (단어 단위 접두 일치, 예: user → /api/users)
         method: HTTP 메서드 (GET, POST 등)
-        tag: 태그 필터
+        tag: 태그 필터 (태그 이름과 정확히 일치)
     """
     await ensure_db_initialized()
-    endpoints = await db_list_endpoints(
+    return await cached(
+        "list_endpoints",
+        {"version": version, "path_pattern": path_pattern, "method": method, "tag": tag},
+        lambda: _render_endpoint_list(version, path_pattern, method, tag)
+    )
+
+
+async def _render_endpoint_list(
+    version: Optional[str],
+    path_pattern: Optional[str],
+    method: Optional[str],
+    tag: Optional[str]
+) -> str:
+    """list_endpoints 결과 문자열 생성"""
+    endpoint_lines = await db_list_endpoints_text(
         version=version,
         path_pattern=path_pattern,
         method=method,
         tag=tag
     )
 
-    if not endpoints:
+    if not endpoint_lines:
         return "조회된 엔드포인트가 없습니다."
 
-    result_lines = [f"총 {len(endpoints)}개의 엔드포인트를 찾았습니다.\n"]
-    for ep in endpoints:
-        tags = ep.get("tags", "[]")
-        result_lines.append(
-            f"[{ep['id']}] {ep['method']} {ep['path']}\n"
-            f"  - 요약: {ep.get('summary', 'N/A')}\n"
-            f"  - 태그: {tags}\n"
-            f"  - 버전: {ep['version']}\n"
-        )
-
-    return "\n".join(result_lines)
+    return "\n".join(chain(
+        (f"총 {len(endpoint_lines)}개의 엔드포인트를 찾았습니다.\n",),
+        endpoint_lines
+    ))
 
 
 @mcp.tool()
@@ -97,20 +133,21 @@ async def get_endpoint_details(endpoint_id: int) -> str:
         endpoint_id: 엔드포인트 ID
     """
     await ensure_db_initialized()
+    return await cached(
+        "get_endpoint_details",
+        {"endpoint_id": endpoint_id},
+        lambda: _render_endpoint_details(endpoint_id)
+    )
+
+
+async def _render_endpoint_details(endpoint_id: int) -> str:
+    """get_endpoint_details 결과 문자열 생성"""
     details = await db_get_endpoint_details(endpoint_id)
 
     if not details:
         return f"엔드포인트 ID {endpoint_id}를 찾을 수 없습니다."
 
-    params = details.get("parameters", [])
-    param_lines = []
-    for p in params:
-        required = "필수" if p["required"] else "선택"
-        schema_ref = f" (스키마: {p['schema_ref']})" if p.get("schema_ref") else ""
-        param_lines.append(
-            f"  - {p['name']} ({p['in_type']}, {required}): {p['type']}{schema_ref}\n"
-            f"    설명: {p.get('description', 'N/A')}"
-        )
+    param_text = "\n".join(_format_parameter(p) for p in details.get("parameters", []))
 
     return (
         f"엔드포인트 상세 정보\n\n"
@@ -121,7 +158,17 @@ async def get_endpoint_details(endpoint_id: int) -> str:
         f"Operation ID: {details.get('operation_id', 'N/A')}\n"
         f"태그: {details.get('tags', 'N/A')}\n"
         f"버전: {details['version']}\n\n"
-        f"파라미터:\n" + ("\n".join(param_lines) if param_lines else "  없음")
+        f"파라미터:\n" + (param_text or "  없음")
+    )
+
+
+def _format_parameter(p: Dict[str, Any]) -> str:
+    """파라미터 한 항목을 출력 문자열로 변환"""
+    required = "필수" if p["required"] else "선택"
+    schema_ref = f" (스키마: {p['schema_ref']})" if p["schema_ref"] else ""
+    return (
+        f"  - {p['name']} ({p['in_type']}, {required}): {p['type']}{schema_ref}\n"
+        f"    설명: {p['description']}"
     )
 
 
@@ -134,37 +181,50 @@ async def get_schema(version: str, schema_name: str) -> str:
         schema_name: 스키마 이름
     """
     await ensure_db_initialized()
+    return await cached(
+        "get_schema",
+        {"version": version, "schema_name": schema_name},
+        lambda: _render_schema(version, schema_name)
+    )
+
+
+async def _render_schema(version: str, schema_name: str) -> str:
+    """get_schema 결과 문자열 생성"""
     schema = await db_get_schema(version, schema_name)
 
     if not schema:
         return f"스키마 '{schema_name}' (버전: {version})를 찾을 수 없습니다."
 
     properties = schema.get("properties", {})
-    required_fields = schema.get("required_fields", [])
-
-    prop_lines = []
-    for prop_name, prop_def in properties.items():
-        is_required = "✓" if prop_name in required_fields else " "
-        prop_type = prop_def.get("type", "unknown")
-        description = prop_def.get("description", "")
-
-        if prop_type == "ref":
-            type_str = f"→ {prop_def.get('ref')}"
-        elif prop_type == "array":
-            type_str = f"array<{prop_def.get('items')}>"
-        else:
-            type_str = prop_type
-
-        prop_lines.append(
-            f"  [{is_required}] {prop_name}: {type_str}\n"
-            f"      {description}"
-        )
+    required_fields = set(schema.get("required_fields", []))
+
+    prop_text = "\n".join(
+        _format_property(prop_name, prop_def, prop_name in required_fields)
+        for prop_name, prop_def in properties.items()
+    )
 
     return (
         f"스키마: {schema_name}\n\n"
         f"타입: {schema.get('type', 'object')}\n"
         f"설명: {schema.get('description', 'N/A')}\n\n"
-        f"속성 ([✓] = 필수 필드):\n" + "\n".join(prop_lines)
+        f"속성 ([✓] = 필수 필드):\n" + prop_text
+    )
+
+
+def _format_property(prop_name: str, prop_def: Dict[str, Any], is_required: bool) -> str:
+    """스키마 속성 한 항목을 출력 문자열로 변환"""
+    prop_type = prop_def.get("type", "unknown")
+
+    if prop_type == "ref":
+        type_str = f"→ {prop_def.get('ref')}"
+    elif prop_type == "array":
+        type_str = f"array<{prop_def.get('items')}>"
+    else:
+        type_str = prop_type
+
+    return (
+        f"  [{'✓' if is_required else ' '}] {prop_name}: {type_str}\n"
+        f"      {prop_def.get('description', '')}"
     )
 
 
@@ -172,21 +232,26 @@ async def get_schema(version: str, schema_name: str) -> str:
 async def list_versions() -> str:
     """저장된 모든 API 버전 목록을 조회합니다."""
     await ensure_db_initialized()
+    return await cached("list_versions", {}, _render_version_list)
+
+
+async def _render_version_list() -> str:
+    """list_versions 결과 문자열 생성"""
     versions = await db_list_versions()
 
     if not versions:
         return "저장된 API 버전이 없습니다."
 
-    result_lines = [f"총 {len(versions)}개의 버전이 저장되어 있습니다.\n"]
-    for v in versions:
-        result_lines.append(
+    return "\n".join(chain(
+        (f"총 {len(versions)}개의 버전이 저장되어 있습니다.\n",),
+        (
             f"버전: {v['version']}\n"
             f"  - 제목: {v['title']}\n"
             f"  - 동기화 시간: {v['synced_at']}\n"
-            f"  - Base URL: {v.get('base_url', 'N/A')}\n"
+            f"  - Base URL: {v['base_url']}\n"
+            for v in versions
         )
-
-    return "\n".join(result_lines)
+    ))
 
 
 if __name__ == "__main__":